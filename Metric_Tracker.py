@@ -1,17 +1,149 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
+import csv
 import json
+import orjson
 import time
-import schedule
-from datetime import datetime, timedelta
-import pandas as pd
+import re
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import urlparse
 import logging
+import logging.handlers
 import threading
+import functools
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+    Each acquired token is handed back by a timer, so at most `rate` calls
+    per second go through on average while bursts up to `capacity` run back-to-back
+    """
+    def __init__(self, rate, capacity):
+        self.refill_delay = capacity / rate
+        self._tokens = threading.Semaphore(capacity)
+
+    def acquire(self):
+        self._tokens.acquire()
+        timer = threading.Timer(self.refill_delay, self._tokens.release)
+        timer.daemon = True
+        timer.start()
+
+
+def retry_on_network_errors(method):
+    """
+    Retry a tracker method on network errors, backing off between attempts
+    Returns None once the tracker's max_retries is used up
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        for attempt in range(self.max_retries):
+            try:
+                return method(self, *args, **kwargs)
+            except (ConnectionError, TimeoutError, requests.exceptions.RequestException) as e:
+                self.logger.warning(f"Connection failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if attempt < self.max_retries - 1:
+                    delay = self._backoff_delay(attempt)
+                    self.logger.info(f"Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+                else:
+                    self.logger.error(f"Max retries reached, giving up on {method.__name__}")
+                    return None
+    return wrapper
 
 
 class YouTubeMetricsTracker:
-    def __init__(self, api_key, max_retries = 3, retry_delay = 60, db_path = 'youtube_metrics.db'):
+    # Bump whenever the DDL in setup_database changes so existing databases pick it up
+    CURRENT_SCHEMA_VERSION = 6
+
+    # Channel IDs are 'UC' followed by 22 URL-safe base64 characters
+    CHANNEL_ID_PATTERN = re.compile(r'UC[A-Za-z0-9_-]{22}')
+
+    # /channel/<id>, /c/<name> or /@<handle>
+    CHANNEL_URL_PATTERN = re.compile(r'/(channel/|c/|@)([^/]+)')
+
+    # One snapshot per channel per hour; a retried collection, or a schedule
+    # shorter than an hour, updates the current hour's row in place
+    INSERT_CHANNEL_SQL = '''
+        INSERT INTO channel_metrics
+        (channel_id, channel_name, subscriber_count, video_count, view_count,
+         custom_url, country, published_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(channel_id, strftime('%Y-%m-%d %H', timestamp)) DO UPDATE SET
+            channel_name = excluded.channel_name,
+            subscriber_count = excluded.subscriber_count,
+            video_count = excluded.video_count,
+            view_count = excluded.view_count,
+            custom_url = excluded.custom_url,
+            country = excluded.country,
+            published_at = excluded.published_at,
+            timestamp = excluded.timestamp
+    '''
+
+    # Re-adding a channel keeps its added_at and tracking strategy
+    INSERT_CONFIG_SQL = '''
+        INSERT INTO tracking_config
+        (channel_id, channel_name, track_videos, max_videos_to_track, last_updated,
+         uploads_playlist_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(channel_id) DO UPDATE SET
+            channel_name = excluded.channel_name,
+            track_videos = excluded.track_videos,
+            max_videos_to_track = excluded.max_videos_to_track,
+            last_updated = excluded.last_updated,
+            uploads_playlist_id = excluded.uploads_playlist_id,
+            active = 1
+    '''
+
+    # Updated in place so the analysis columns filled by data_processor survive
+    INSERT_COMMENT_SQL = '''
+        INSERT INTO comments
+        (comment_id, video_id, author_name, author_channel_id, comment_text,
+         like_count, published_at, updated_at, reply_count, is_reply, parent_comment_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(comment_id) DO UPDATE SET
+            author_name = excluded.author_name,
+            comment_text = excluded.comment_text,
+            like_count = excluded.like_count,
+            updated_at = excluded.updated_at,
+            reply_count = excluded.reply_count
+    '''
+
+    # One snapshot per video per hour, like INSERT_CHANNEL_SQL
+    INSERT_VIDEO_SQL = '''
+        INSERT INTO video_metrics
+        (video_id, channel_id, title, view_count, like_count,
+         comment_count, duration, published_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(video_id, strftime('%Y-%m-%d %H', timestamp)) DO UPDATE SET
+            title = excluded.title,
+            view_count = excluded.view_count,
+            like_count = excluded.like_count,
+            comment_count = excluded.comment_count,
+            duration = excluded.duration,
+            timestamp = excluded.timestamp
+    '''
+
+    # Comment snippet fields requested from commentThreads.list
+    COMMENT_FIELDS = 'authorDisplayName,authorChannelId,textDisplay,likeCount,publishedAt,updatedAt'
+
+    CHANNEL_CACHE_TTL = 600
+
+    # 403 reasons that clear on their own, unlike quotaExceeded
+    RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+    WRITE_BATCH_ROWS = 500
+    WRITE_BATCH_SECONDS = 1.0
+
+    def __init__(self, api_key, max_retries = 3, retry_delay = 60, db_path = 'youtube_metrics.db',
+                 requests_per_second = 10):
         """
         Initialize the YouTube metrics tracker
         """
@@ -20,96 +152,275 @@ class YouTubeMetricsTracker:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.db_path = db_path
+        self._local = threading.local()
+        self._scheduler = None
+        # Shared across worker threads to keep API calls within quota
+        self._bucket = TokenBucket(rate = requests_per_second, capacity = requests_per_second)
+        # Channel lookups by ID, as {channel_id: (expires_at, channel_info)}
+        self._channel_cache = {}
+        self._channel_cache_lock = threading.Lock()
+        self.setup_session()
         self.setup_logging()
         self.setup_database()
+        # Metric rows from every channel are committed by a single writer thread
+        self._write_q = queue.Queue()
+        threading.Thread(target = self._writer_loop, daemon = True).start()
+
+    def setup_session(self):
+        """
+        Setup a pooled HTTP session so API calls reuse the same TLS connection
+        """
+        self.session = requests.Session()
+        self.session.params = {'key': self.api_key}
+        # Google APIs only compress responses when the User-Agent also mentions gzip
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'youtube-metrics-tracker (gzip)'
+        })
+
+        adapter = HTTPAdapter(
+            pool_connections = 4,
+            pool_maxsize = 20,
+            max_retries = Retry(total = 3, backoff_factor = 0.5,
+                                status_forcelist = [429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
 
     def setup_logging(self):
         """
         Setup logging for tracking operations
+        Handlers are only configured once per process, and file writes are
+        buffered so INFO lines reach disk in batches (errors flush immediately)
         """
-        logging.basicConfig(
-            level = logging.INFO,
-            format = '%(asctime)s - %(levelname)s - %(message)s',
-            handlers = [logging.FileHandler('youtube_tracker.log'),
-                        logging.StreamHandler()
-                        ]
-        )
+        if not logging.getLogger().handlers:
+            log_format = '%(asctime)s - %(levelname)s - %(message)s'
+            file_handler = logging.handlers.RotatingFileHandler(
+                'youtube_tracker.log', maxBytes = 10_000_000, backupCount = 3
+            )
+            # Buffered records are written by the target, not the MemoryHandler,
+            # so the file handler needs its own formatter
+            file_handler.setFormatter(logging.Formatter(log_format))
+            logging.basicConfig(
+                level = logging.INFO,
+                format = log_format,
+                handlers = [logging.handlers.MemoryHandler(capacity = 256, target = file_handler),
+                            logging.StreamHandler()
+                            ]
+            )
         self.logger = logging.getLogger(__name__)
 
+    def _conn(self):
+        """
+        Get this thread's long-lived SQLite connection, opening it on first use
+        The connection runs in autocommit mode, so multi-statement writes
+        need an explicit BEGIN
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Statements are cached by SQL text, so the class-level SQL constants
+            # are only prepared once per connection
+            conn = sqlite3.connect(self.db_path, isolation_level = None, check_same_thread = False,
+                                   timeout = 30, cached_statements = 256)
+
+            # WAL lets exports and config lookups read while metrics are written,
+            # and NORMAL sync halves the fsyncs per commit
+            if self.db_path != ':memory:':
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                # Exports scan whole metric tables; map the file and keep 64 MB of pages cached
+                conn.execute("PRAGMA mmap_size=268435456")
+                conn.execute("PRAGMA cache_size=-65536")
+
+            self._local.conn = conn
+        return conn
+
     def setup_database(self):
         """
         Create database tables for storing metrics over time
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn()
         cursor = conn.cursor()
 
-        # Channel metrics table
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS channel_metrics (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           channel_id TEXT NOT NULL,
-                           channel_name TEXT,
-                           timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                           subscriber_count INTEGER,
-                           video_count INTEGER,
-                           view_count INTEGER,
-                           custom_url TEXT,
-                           country TEXT,
-                           published_at TEXT
-                       )
-                       ''')
-        
-        # Video metrics table
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS video_metrics (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           video_id TEXT NOT NULL,
-                           channel_id TEXT NOT NULL,
-                           title TEXT,
-                           timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                           view_count INTEGER,
-                           like_count INTEGER,
-                           comment_count INTEGER,
-                           duration TEXT,
-                           published_at TEXT)
-                       ''')
-        # Comments table
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS comments (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           comment_id TEXT NOT NULL,
-                           video_id TEXT NOT NULL,
-                           author_name TEXT NOT NULL,
-                           author_channel_id TEXT NOT NULL,
-                           comment_text TEXT,
-                           like_count INTEGER,
-                           published_at TEXT,
-                           updated_at TEXT,
-                           reply_count INTEGER,
-                           is_reply BOOLEAN DEFAULT 0,
-                           parent_comment_id TEXT)
-                       ''')
+        # Skip the DDL when the schema is already up to date
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] == self.CURRENT_SCHEMA_VERSION:
+            return
+
+        # Only takes effect on a brand new database file
+        if self.db_path != ':memory:':
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
+        # Rolls back on error so a half-built schema never gets the new version;
+        # the version is checked again under the write lock in case another
+        # instance upgraded the database first
+        with conn:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] == self.CURRENT_SCHEMA_VERSION:
+                return
+
+            # Channel metrics table
+            cursor.execute('''
+                           CREATE TABLE IF NOT EXISTS channel_metrics (
+                               id INTEGER PRIMARY KEY AUTOINCREMENT,
+                               channel_id TEXT NOT NULL,
+                               channel_name TEXT,
+                               timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                               subscriber_count INTEGER,
+                               video_count INTEGER,
+                               view_count INTEGER,
+                               custom_url TEXT,
+                               country TEXT,
+                               published_at TEXT
+                           )
+                           ''')
         
-        # Channel config table
-        cursor.execute('''
-                       CREATE TABLE IF NOT EXISTS tracking_config (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           channel_id TEXT NOT NULL UNIQUE,
-                           channel_name TEXT,
-                           track_videos BOOLEAN DEFAULT 0,
-                           max_videos_to_track INTEGER DEFAULT 10,
-                           added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                           last_updated DATETIME,
-                           active BOOLEAN DEFAULT 1)
-                       ''')
+            # Video metrics table
+            cursor.execute('''
+                           CREATE TABLE IF NOT EXISTS video_metrics (
+                               id INTEGER PRIMARY KEY AUTOINCREMENT,
+                               video_id TEXT NOT NULL,
+                               channel_id TEXT NOT NULL,
+                               title TEXT,
+                               timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                               view_count INTEGER,
+                               like_count INTEGER,
+                               comment_count INTEGER,
+                               duration TEXT,
+                               published_at TEXT)
+                           ''')
+            # Comments table
+            cursor.execute('''
+                           CREATE TABLE IF NOT EXISTS comments (
+                               id INTEGER PRIMARY KEY AUTOINCREMENT,
+                               comment_id TEXT NOT NULL,
+                               video_id TEXT NOT NULL,
+                               author_name TEXT NOT NULL,
+                               author_channel_id TEXT NOT NULL,
+                               comment_text TEXT,
+                               like_count INTEGER,
+                               published_at TEXT,
+                               updated_at TEXT,
+                               reply_count INTEGER,
+                               is_reply BOOLEAN DEFAULT 0,
+                               parent_comment_id TEXT)
+                           ''')
         
-        conn.commit()
-        conn.close()
+            # Channel config table
+            cursor.execute('''
+                           CREATE TABLE IF NOT EXISTS tracking_config (
+                               id INTEGER PRIMARY KEY AUTOINCREMENT,
+                               channel_id TEXT NOT NULL UNIQUE,
+                               channel_name TEXT,
+                               track_videos BOOLEAN DEFAULT 0,
+                               max_videos_to_track INTEGER DEFAULT 10,
+                               added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                               last_updated DATETIME,
+                               active BOOLEAN DEFAULT 1,
+                               video_tracking_strategy TEXT DEFAULT 'time_based',
+                               video_tracking_days INTEGER DEFAULT 30,
+                               uploads_playlist_id TEXT)
+                           ''')
+
+            # Tables created before these columns were part of the DDL only get
+            # them from migrations 001 and 009; add any that are still missing
+            cursor.execute("PRAGMA table_info(tracking_config)")
+            config_columns = {col[1] for col in cursor.fetchall()}
+            for column, definition in (('video_tracking_strategy', "TEXT DEFAULT 'time_based'"),
+                                       ('video_tracking_days', 'INTEGER DEFAULT 30'),
+                                       ('uploads_playlist_id', 'TEXT')):
+                if column not in config_columns:
+                    cursor.execute(f"ALTER TABLE tracking_config ADD COLUMN {column} {definition}")
+
+            # Indices for the per-channel lookups and time-ordered exports
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_cm_channel_time
+                           ON channel_metrics(channel_id, timestamp)
+                           ''')
+
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_vm_channel_time
+                           ON video_metrics(channel_id, timestamp)
+                           ''')
+
+            # Per-video history, e.g. view growth of one video over time
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_vm_video_time
+                           ON video_metrics(video_id, timestamp)
+                           ''')
+
+            # Newest-first video lookups in get_videos_to_track and comment collection
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_vm_channel_pub
+                           ON video_metrics(channel_id, published_at DESC)
+                           ''')
+
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_comments_video_pub
+                           ON comments(video_id, published_at)
+                           ''')
+
+            # Backs the hourly upsert in INSERT_CHANNEL_SQL; older databases may
+            # hold several snapshots in one hour, so keep only the latest
+            cursor.execute('''
+                           DELETE FROM channel_metrics
+                            WHERE id NOT IN (SELECT MAX(id) FROM channel_metrics
+                                              GROUP BY channel_id, strftime('%Y-%m-%d %H', timestamp))
+                           ''')
+            if cursor.rowcount > 0:
+                self.logger.warning(f"Removed {cursor.rowcount} older same-hour channel snapshots "
+                                    f"before adding the hourly unique index")
+
+            cursor.execute('''
+                           CREATE UNIQUE INDEX IF NOT EXISTS idx_cm_channel_hour
+                           ON channel_metrics(channel_id, strftime('%Y-%m-%d %H', timestamp))
+                           ''')
+
+            # Same for video snapshots (INSERT_VIDEO_SQL)
+            cursor.execute('''
+                           DELETE FROM video_metrics
+                            WHERE id NOT IN (SELECT MAX(id) FROM video_metrics
+                                              GROUP BY video_id, strftime('%Y-%m-%d %H', timestamp))
+                           ''')
+            if cursor.rowcount > 0:
+                self.logger.warning(f"Removed {cursor.rowcount} older same-hour video snapshots "
+                                    f"before adding the hourly unique index")
+
+            cursor.execute('''
+                           CREATE UNIQUE INDEX IF NOT EXISTS idx_vm_video_hour
+                           ON video_metrics(video_id, strftime('%Y-%m-%d %H', timestamp))
+                           ''')
+
+            # Comments are upserted by comment_id (INSERT_COMMENT_SQL); tables
+            # created here rather than by migration 002 lack the UNIQUE constraint
+            cursor.execute('''
+                           DELETE FROM comments
+                            WHERE id NOT IN (SELECT MAX(id) FROM comments GROUP BY comment_id)
+                           ''')
+            if cursor.rowcount > 0:
+                self.logger.warning(f"Removed {cursor.rowcount} duplicate comment rows "
+                                    f"before adding the comment_id unique index")
+
+            cursor.execute('''
+                           CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_comment_id
+                           ON comments(comment_id)
+                           ''')
+
+            cursor.execute('''
+                           CREATE INDEX IF NOT EXISTS idx_tc_active
+                           ON tracking_config(channel_id) WHERE active = 1
+                           ''')
+
+            cursor.execute(f"PRAGMA user_version = {self.CURRENT_SCHEMA_VERSION}")
+
+            # Refresh planner statistics so the new indexes get picked
+            cursor.execute("ANALYZE")
         self.logger.info("Database setup completed")
     
     def add_channel_to_tracking(self, channel_identifier, track_videos = True, max_videos = 50):
         """
-        Add a channel to the tracking list
+        Add a channel to the tracking list and store its first metrics
         """
         # Get channel info
         channel_info = self.get_channel_info(channel_identifier)
@@ -117,55 +428,113 @@ class YouTubeMetricsTracker:
             self.logger.error(f"Could not find channel: {channel_identifier}")
             return False
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        channel_id = channel_info['id']
+        uploads_playlist = channel_info['contentDetails']['relatedPlaylists']['uploads']
 
         try:
-            cursor.execute('''
-                           INSERT OR REPLACE INTO tracking_config
-                           (channel_id, channel_name, track_videos, max_videos_to_track, last_updated)
-                           VALUES (?, ?, ?, ?, ?)
-                           ''', (
-                               channel_info['id'],
-                               channel_info['snippet']['title'],
-                               track_videos,
-                               max_videos,
-                               datetime.now()
-                           ))
-            conn.commit()
-            self.logger.info(f"Added channel to tracking: {channel_info['snippet']['title']}")
-
-            self.collect_channel_metrics(channel_info['id'])
+            # API calls happen before the transaction so the write lock is held briefly
+            video_details = []
+            if track_videos:
+                video_ids, _ = self._fetch_upload_ids(
+                    channel_id, channel_info, (track_videos, None, None, max_videos, uploads_playlist))
+                video_details = self.get_video_details(video_ids)
+
+            conn = self._conn()
+
+            # The config row and the first collection commit together
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute(self.INSERT_CONFIG_SQL, (
+                    channel_id,
+                    channel_info['snippet']['title'],
+                    track_videos,
+                    max_videos,
+                    datetime.now(),
+                    uploads_playlist
+                ))
+
+                # Read back the strategy columns so their defaults apply
+                strategy, days = conn.execute('''
+                                              SELECT video_tracking_strategy, video_tracking_days
+                                                FROM tracking_config
+                                               WHERE channel_id = ?
+                                              ''', (channel_id,)).fetchone()
+                try:
+                    videos = self._select_videos_to_store(
+                        video_details, strategy or 'recent_count', days or 30, max_videos)
+                except Exception as e:
+                    self.logger.error(f"Error collecting video metrics: {e}")
+                    videos = []
+
+                conn.execute(self.INSERT_CHANNEL_SQL, self._channel_row(channel_id, channel_info))
+                conn.executemany(self.INSERT_VIDEO_SQL, self._video_rows(channel_id, videos))
 
+            self.logger.info(f"Added channel to tracking: {channel_info['snippet']['title']}")
             return True
         
         except Exception as e:
             self.logger.error(f"Error adding channel to tracking: {e}")
             return False
-        
-        finally:
-            conn.close()
 
-    def get_channel_info_with_retry(self, channel_identifier):
+    def _backoff_delay(self, attempt):
+        """
+        Exponential backoff with jitter, capped at retry_delay seconds
+        """
+        return min(self.retry_delay, 2 ** attempt + random.uniform(0, 1))
+
+    def _get_json(self, url, params):
         """
-        Get channel info with retry logic for network errors
+        GET an API endpoint within the shared rate limit and decode the response
+        Per-user rate limit errors back off and retry, quota exhaustion raises
         """
         for attempt in range(self.max_retries):
-            try:
-                return self.get_channel_info(channel_identifier)
-            except (ConnectionError, TimeoutError, requests.exceptions.RequestException) as e:
-                self.logger.warning(f"API call failed (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    self.logger.error("Max retries reached for API call.")
-                    return None
+            self._bucket.acquire()
+            response = self.session.get(url, params = params, timeout = 30)
+
+            if response.status_code == 403 and attempt < self.max_retries - 1:
+                try:
+                    errors = orjson.loads(response.content).get('error', {}).get('errors', [])
+                except orjson.JSONDecodeError:
+                    errors = []
+                if any(error.get('reason') in self.RATE_LIMIT_REASONS for error in errors):
+                    delay = self._backoff_delay(attempt)
+                    self.logger.warning(f"Rate limited by the API, retrying in {delay:.1f} seconds")
+                    time.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            return orjson.loads(response.content)
+
+    def get_channel_info_cached(self, channel_id, allow_stale = False):
+        """
+        Get channel info by ID, reusing a response fetched within CHANNEL_CACHE_TTL seconds
+        With allow_stale, an expired response is returned if the API call fails;
+        only use it when the caller needs fields that don't change, like the uploads playlist
+        """
+        now = time.monotonic()
+        with self._channel_cache_lock:
+            entry = self._channel_cache.get(channel_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        try:
+            channel_info = self.get_channel_info(channel_id)
+        except requests.exceptions.RequestException:
+            if allow_stale and entry:
+                self.logger.warning(f"Using cached channel info for {channel_id} after an API error")
+                return entry[1]
+            raise
+
+        if channel_info:
+            with self._channel_cache_lock:
+                self._channel_cache[channel_id] = (now + self.CHANNEL_CACHE_TTL, channel_info)
+        return channel_info
 
     def get_channel_info(self, channel_identifier):
         """
         Get basic channel information
         """
-        if channel_identifier.startswith('UC') and len(channel_identifier) == 24:
+        if self.CHANNEL_ID_PATTERN.fullmatch(channel_identifier):
             channel_id = channel_identifier
         elif channel_identifier.startswith('http'):
             channel_id = self.extract_channel_id_from_url(channel_identifier)
@@ -177,15 +546,16 @@ class YouTubeMetricsTracker:
         
         url = f"{self.base_url}/channels"
         params = {
-            'key': self.api_key,
             'id': channel_id,
-            'part': 'snippet,statistics,contentDetails'
+            'part': 'snippet,statistics,contentDetails',
+            # Only request the fields we store
+            'fields': 'items(id,snippet(title,customUrl,country,publishedAt),'
+                      'statistics(subscriberCount,videoCount,viewCount),'
+                      'contentDetails/relatedPlaylists/uploads)'
         }
 
         try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(url, params)
 
             if 'items' in data and data['items']:
                 return data['items'][0]
@@ -194,37 +564,21 @@ class YouTubeMetricsTracker:
             self.logger.error(f"API request failed: {e}")
             raise
 
-    def collect_metrics_with_retry(self, channel_identifier):
-        """
-        Collect metrics with retry logic
-        """
-        for attempt in range(self.max_retries):
-            try:
-                return self.collect_all_tracked_channels()
-            except (ConnectionError, TimeoutError, requests.exceptions.RequestException) as e:
-                self.logger.warning(f"Connection failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt < self.max_retries - 1:
-                    self.logger.info(f"Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    self.logger.error("Max retries reached. Skipping this collection cycle.")
-                    return None
-
     def extract_channel_id_from_url(self, url):
         """
         Extract channel ID from URL
         """
-        if '/channel/' in url:
-            return url.split('/channel/')[-1].split('/')[0]
-        elif '/c/' in url:
-            channel_name = url.split('/c/')[-1].split('/')[0]
-            return self.search_channel_by_name(channel_name)
-        elif '/@' in url:
-            handle = url.split('/@')[-1].split('/')[0]
-            return self.search_channel_by_name(handle)
-        # Add other URL parsing logic as needed
-        else:
+        # Only the path is matched, so query strings like ?si=... are ignored
+        match = self.CHANNEL_URL_PATTERN.search(urlparse(url).path)
+        if not match:
+            # Add other URL parsing logic as needed
             return None
+
+        kind, value = match.groups()
+        if kind == 'channel/':
+            return value
+        # /c/<name> and /@<handle> URLs have to be resolved by search
+        return self.search_channel_by_name(value)
     
     def search_channel_by_name(self, name):
         """
@@ -232,60 +586,43 @@ class YouTubeMetricsTracker:
         """
         url = f"{self.base_url}/search"
         params = {
-            'key': self.api_key,
             'q': name,
             'type': 'channel',
             'part': 'id',
-            'maxResults': 1
+            'maxResults': 1,
+            'fields': 'items/id/channelId'
         }
 
-        response = requests.get(url, params = params)
-        data = response.json()
+        data = self._get_json(url, params)
 
         if 'items' in data and data['items']:
             return data['items'][0]['id']['channelId']
         return None
     
-    def collect_channel_metrics(self, channel_id):
+    def collect_channel_metrics(self, channel_id, channel_info = None, config = None):
         """
         Collect and store current channel metrics
+        Pass channel_info when it has already been fetched to skip the API call,
+        and the channel's tracking_config row to skip the lookup
+        Rows go through the writer queue and are committed before this returns
         """
         try:
-            channel_info = self.get_channel_info(channel_id)
+            if channel_info is None:
+                channel_info = self.get_channel_info_cached(channel_id)
             if not channel_info:
                 self.logger.error(f"Could not fetch data for channel: {channel_id}")
                 return False
             
-            snippet = channel_info.get('snippet', {})
-            statistics = channel_info.get('statistics', {})
-
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                           INSERT OR REPLACE INTO channel_metrics
-                           (channel_id, channel_name, subscriber_count, video_count, view_count,
-                            custom_url, country, published_at)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                           ''', (
-                               channel_id,
-                               snippet.get('title', ''),
-                               int(statistics.get('subscriberCount', 0)),
-                               int(statistics.get('videoCount', 0)),
-                               int(statistics.get('viewCount', 0)),
-                               snippet.get('customUrl', ''),
-                               snippet.get('country', ''),
-                               snippet.get('publishedAt', '')
-                           ))
-            
-            conn.commit()
-            conn.close()
-
-            self.logger.info(f"Collected metrics for channel: {snippet.get('title', channel_id)}")
+            self._queue_channel_row(channel_id, channel_info)
 
             # Also collect video metrics if enabled
-            self.collect_video_metrics(channel_id)
+            videos = self._fetch_videos_to_store(channel_id, channel_info, config)
+            self._queue_video_rows(channel_id, videos)
 
+            if videos:
+                self.logger.debug(f"Collected metrics for {len(videos)} videos")
+
+            self.flush()
             return True
         
         except Exception as e:
@@ -302,8 +639,7 @@ class YouTubeMetricsTracker:
         if strategy not in valid_strategies:
             raise ValueError(f"Invalid strategy: {strategy}. Must be one of {valid_strategies}")
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
 
         cursor.execute('''
             UPDATE tracking_config
@@ -311,16 +647,12 @@ class YouTubeMetricsTracker:
             WHERE channel_id = ?
         ''', (strategy, channel_id))
 
-        conn.commit()
-        conn.close()
-
         
     def get_videos_to_track(self, channel_id):
         """
         Get videos that should be tracked based on strategy
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
         
         # Get channel config
         cursor.execute('''
@@ -336,212 +668,308 @@ class YouTubeMetricsTracker:
         else:
             strategy, days, max_videos = 'time_based', 30, 50
 
-        if strategy == 'time_based':
-            # Track videos published within timeframe
-            query = '''
-                SELECT video_id FROM video_metrics
-                 WHERE channel_id = ?
-                      AND published_at >= datetime('now', '-' || ? || ' days')
-                 ORDER BY published_at DESC
-            '''
-            cursor.execute(query, (channel_id, days))
-
-        elif strategy == 'recent_count':
-            # Track most recent videos: fixed number
-            query = '''
-                SELECT video_id FROM video_metrics
-                 WHERE channel_id = ?
-                 ORDER BY published_at DESC
-                 LIMIT ?
-            '''
-            cursor.execute(query, (channel_id, max_videos))
-
-        elif strategy == 'hybrid':
-            # Use time window but cap at max_videos_to_track
-            query = '''
-                SELECT video_id FROM video_metrics
-                 WHERE channel_id = ?
-                      AND published_at >= datetime('now', '-' || ? || ' days')
-                 ORDER BY published_at DESC
-                 LIMIT ?
-            '''
-            cursor.execute(query, (channel_id, days, max_videos))
-
-        else:
+        if strategy not in ('time_based', 'recent_count', 'hybrid'):
             # Invalid strategy, default to time_based
             self.logger.warning(f"Invalid startegy '{strategy}', defaulting to time_based")
-            query = '''
-                SELECT video_id FROM video_metrics
-                 WHERE channel_id = ?
-                      AND published_at >= datetime('now', '-' || ? || ' days')
-                 ORDER BY published_at DESC
+            strategy = 'time_based'
 
-            '''
-            cursor.execute(query, (channel_id, days))
+        # One query covers every strategy: recent_count skips the time window and
+        # time_based drops the cap (LIMIT -1). published_at is the API's ISO string.
+        cutoff_iso = (datetime.now(timezone.utc) - timedelta(days = days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        cursor.execute('''
+                       SELECT video_id FROM video_metrics
+                        WHERE channel_id = ?
+                             AND (? OR published_at >= ?)
+                        GROUP BY video_id
+                        ORDER BY published_at DESC
+                        LIMIT ?
+                       ''', (
+                           channel_id,
+                           strategy == 'recent_count',
+                           cutoff_iso,
+                           -1 if strategy == 'time_based' else max_videos
+                       ))
         
         videos = cursor.fetchall()
-        conn.close()
         return [v[0] for v in videos]
         
-    def collect_video_metrics(self, channel_id):
+    def _fetch_videos_to_store(self, channel_id, channel_info = None, config = None):
         """
-        Collect metrics for videos based on tracking strategy
+        Fetch video details to store based on tracking strategy
+        Makes no database writes
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        video_ids, settings = self._fetch_upload_ids(channel_id, channel_info, config)
+        if not video_ids:
+            return []
 
-        # Check if we should track videos for this channel
-        cursor.execute('''
-                       SELECT track_videos, video_tracking_strategy, video_tracking_days, max_videos_to_track
-                         FROM tracking_config
-                        WHERE channel_id = ? AND active = 1
-                       ''', (channel_id,))
-        
-        config = cursor.fetchone() # Return the next row query result
+        try:
+            # Get detailed video info for all fetched videos
+            video_details = self.get_video_details(video_ids)
+            return self._select_videos_to_store(video_details, *settings)
+
+        except Exception as e:
+            self.logger.error(f"Error collecting video metrics: {e}")
+            return []
+
+    def _fetch_upload_ids(self, channel_id, channel_info = None, config = None):
+        """
+        Get the IDs of a channel's most recent uploads, newest first
+        Returns (video_ids, (strategy, days, max_videos)), with no IDs when
+        video tracking is disabled for the channel
+        """
+        if config is None:
+            cursor = self._conn().cursor()
+
+            # Check if we should track videos for this channel
+            cursor.execute('''
+                           SELECT track_videos, video_tracking_strategy, video_tracking_days,
+                                  max_videos_to_track, uploads_playlist_id
+                             FROM tracking_config
+                            WHERE channel_id = ? AND active = 1
+                           ''', (channel_id,))
+
+            config = cursor.fetchone() # Return the next row query result
         if not config or not config[0]: # Check if there is an additional channel to track
-            conn.close()
-            return
+            return [], None
         
-        # Handle pre-migration databases
-        if len(config) >= 4:
-            track_videos, strategy, days, max_videos = config
-            strategy = strategy or 'recent_count'
-            days = days or 30
-            max_videos = max_videos or 50
-        else:
-            track_videos, max_videos = config[0], config[1]
-            strategy = 'recent_count'
-            days = 30
-
-        conn.close()
+        track_videos, strategy, days, max_videos, uploads_playlist = config
+        settings = (strategy or 'recent_count', days or 30, max_videos or 50)
 
         try:
-            # Get channel's upload playlist
-            channel_info = self.get_channel_info(channel_id)
-            if not channel_info:
-                return
-            
-            uploads_playlist = channel_info['contentDetails']['relatedPlaylists']['uploads']
+            # The uploads playlist never changes, so it is stored when the channel is added
+            # Channels added before it was stored fall back to the channel info
+            if not uploads_playlist:
+                if channel_info is None:
+                    channel_info = self.get_channel_info_cached(channel_id, allow_stale = True)
+                if not channel_info:
+                    return [], settings
+                uploads_playlist = channel_info['contentDetails']['relatedPlaylists']['uploads']
             
             # Fetch ALL recent videos from API (or a resonable number)
-            api_fetch_limit = max(max_videos, 50)
+            api_fetch_limit = max(settings[2], 50)
 
             # Get recent videos
             url = f"{self.base_url}/playlistItems"
             params = {
-                'key': self.api_key,
                 'playlistId': uploads_playlist,
                 'part': 'contentDetails',
-                'maxResults': api_fetch_limit
+                'maxResults': api_fetch_limit,
+                'fields': 'items/contentDetails/videoId'
             }
 
-            response = requests.get(url, params = params)
-            data = response.json()
+            data = self._get_json(url, params)
 
             if 'items' not in data:
-                return
+                return [], settings
             
-            video_ids = [item['contentDetails']['videoId'] for item in data['items']]
+            return [item['contentDetails']['videoId'] for item in data['items']], settings
 
-            # Get detailed video info for all fetched videos
-            video_details = self.get_video_details(video_ids)
+        except Exception as e:
+            self.logger.error(f"Error collecting video metrics: {e}")
+            return [], settings
 
-            videos_to_store = []
-            cutoff_date = datetime.now() - timedelta(days = days)
-
-            if strategy == 'time_based':
-                # Store videos published within the time window
-                for video in video_details:
-                    published_str = video.get('snippet', {}).get('publishedAt', '')
-                    if published_str:
-                        published_date = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
-                        if published_date >= cutoff_date:
-                            videos_to_store.append(video)
-
-            elif strategy == 'recent_count':
-                # Store only the N most recent videos
-                videos_to_store = video_details[:max_videos]
-
-            elif strategy == 'hybrid':
-                # Store videos within time window, capped at max count
-                for video in video_details:
-                    published_str = video.get('snippet', {}).get('publishedAt', '')
-                    if published_str:
-                        published_date = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
-                        if published_date >= cutoff_date:
-                            videos_to_store.append(video)
-                            if len(videos_to_store) >= max_videos:
-                                break
-            else:
-                self.logger.warning(f"Invalid startegy '{strategy}', defaulting to recent_count")
-                videos_to_store = video_details[:max_videos]
-
-            # Store video metrics
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+    def _select_videos_to_store(self, video_details, strategy, days, max_videos):
+        """
+        Filter fetched video details by the channel's tracking strategy
+        """
+        videos_to_store = []
+        # publishedAt is UTC ISO 8601 ('2024-01-31T12:00:00Z'), which sorts as a string,
+        # so compare against a cutoff in the same format instead of parsing each date
+        cutoff_iso = (datetime.now(timezone.utc) - timedelta(days = days)).strftime('%Y-%m-%dT%H:%M:%SZ')
 
+        if strategy == 'time_based':
+            # Store videos published within the time window
             for video in video_details:
-                snippet = video.get('snippet', {})
-                statistics = video.get('statistics', {})
-                content_details = video.get('contentDetails', {})
-
-                cursor.execute('''
-                               INSERT OR REPLACE INTO video_metrics
-                               (video_id, channel_id, title, view_count, like_count,
-                                comment_count, duration, published_at)
-                               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                video['id'],
-                                channel_id,
-                                snippet.get('title', ''),
-                                int(statistics.get('viewCount', 0)),
-                                int(statistics.get('likeCount', 0)),
-                                int(statistics.get('commentCount', 0)),
-                                content_details.get('duration', ''),
-                                snippet.get('publishedAt', '')
-                            ))
-            conn.commit()
-            conn.close()
+                if video.get('snippet', {}).get('publishedAt', '') >= cutoff_iso:
+                    videos_to_store.append(video)
+
+        elif strategy == 'recent_count':
+            # Store only the N most recent videos
+            videos_to_store = video_details[:max_videos]
+
+        elif strategy == 'hybrid':
+            # Store videos within time window, capped at max count
+            for video in video_details:
+                if video.get('snippet', {}).get('publishedAt', '') >= cutoff_iso:
+                    videos_to_store.append(video)
+                    if len(videos_to_store) >= max_videos:
+                        break
+        else:
+            self.logger.warning(f"Invalid startegy '{strategy}', defaulting to recent_count")
+            videos_to_store = video_details[:max_videos]
+
+        return videos_to_store
+
+    def _channel_row(self, channel_id, channel_info):
+        """
+        Build a channel_metrics row from a channels.list item
+        """
+        snippet = channel_info.get('snippet', {})
+        statistics = channel_info.get('statistics', {})
+
+        return (
+            channel_id,
+            snippet.get('title', ''),
+            int(statistics.get('subscriberCount', 0)),
+            int(statistics.get('videoCount', 0)),
+            int(statistics.get('viewCount', 0)),
+            snippet.get('customUrl', ''),
+            snippet.get('country', ''),
+            snippet.get('publishedAt', '')
+        )
+
+    def _video_rows(self, channel_id, videos):
+        """
+        Build video_metrics rows from videos.list items
+        """
+        empty = {}
+        rows = []
+        append = rows.append
+        for video in videos:
+            snippet = video.get('snippet', empty)
+            stat = video.get('statistics', empty).get
+
+            append((
+                video['id'],
+                channel_id,
+                snippet.get('title', ''),
+                # Counts the owner hides are missing, not zero-valued
+                int(stat('viewCount', 0)),
+                int(stat('likeCount', 0)),
+                int(stat('commentCount', 0)),
+                video.get('contentDetails', empty).get('duration', ''),
+                snippet.get('publishedAt', '')
+            ))
+        return rows
+
+    def _queue_channel_row(self, channel_id, channel_info):
+        """
+        Hand a channel metric row to the writer thread
+        """
+        self._write_q.put((self.INSERT_CHANNEL_SQL, [self._channel_row(channel_id, channel_info)]))
+        self.logger.info(f"Collected metrics for channel: "
+                         f"{channel_info.get('snippet', {}).get('title', channel_id)}")
+
+    def _queue_video_rows(self, channel_id, video_details):
+        """
+        Hand a channel's video metric rows to the writer thread as one batch
+        """
+        rows = self._video_rows(channel_id, video_details)
+        if rows:
+            self._write_q.put((self.INSERT_VIDEO_SQL, rows))
 
-            self.logger.info(f"Collected metrics for {len(video_details)} videos")
+    def _writer_loop(self):
+        """
+        Commit queued rows every WRITE_BATCH_ROWS rows or WRITE_BATCH_SECONDS
+        Queue items are (sql, rows) pairs, or (None, None) from flush()
+        """
+        pending = {}
+        items = 0
+        row_count = 0
+        deadline = None
 
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                sql, rows = self._write_q.get(timeout = timeout)
+                items += 1
+                if sql is not None:
+                    pending.setdefault(sql, []).extend(rows)
+                    row_count += len(rows)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.WRITE_BATCH_SECONDS
+                    if row_count < self.WRITE_BATCH_ROWS:
+                        continue
+            except queue.Empty:
+                pass
+
+            conn = None
+            try:
+                if pending:
+                    conn = self._conn()
+                    with conn:
+                        conn.execute('BEGIN IMMEDIATE')
+                        for sql, sql_rows in pending.items():
+                            conn.executemany(sql, sql_rows)
+            except Exception as e:
+                # The batch spans every channel of a collection cycle, so fall back to
+                # row-by-row writes rather than dropping all of it for one bad row.
+                # The writer thread must keep running either way
+                self.logger.warning(f"Batch write of {row_count} queued rows failed ({e}), retrying row by row")
+                if conn is not None:
+                    self._write_rows_individually(conn, pending)
+            finally:
+                # Every item, including flush() markers, is marked done so join() returns
+                for _ in range(items):
+                    self._write_q.task_done()
+                pending = {}
+                items = 0
+                row_count = 0
+                deadline = None
+
+    def _write_rows_individually(self, conn, pending):
+        """
+        Write a failed batch one row at a time in a single transaction,
+        logging and skipping the rows that can't be written
+        """
+        failed = 0
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                for sql, sql_rows in pending.items():
+                    for row in sql_rows:
+                        try:
+                            conn.execute(sql, row)
+                        except Exception as e:
+                            failed += 1
+                            self.logger.error(f"Dropping queued row {row[:2]}: {e}")
         except Exception as e:
-            self.logger.error(f"Error collecting video metrics: {e}")
-            return False
+            self.logger.error(f"Error writing queued rows individually: {e}")
+            return
+
+        if failed:
+            self.logger.error(f"Dropped {failed} queued rows that could not be written")
+
+    def flush(self):
+        """
+        Block until every queued metric row has been committed
+        """
+        self._write_q.put((None, None))
+        self._write_q.join()
         
-    def get_video_details(self, video_ids):
+    def get_video_details(self, video_ids, max_workers = 4):
         """
         Get detailed information for videos
+        Batches of 50 IDs are fetched concurrently, results keep the input order
         """
-        video_details = []
+        url = f"{self.base_url}/videos"
 
-        for i in range(0, len(video_ids), 50):
-            batch_ids = video_ids[i:i+50]
-            ids_string = ','.join(batch_ids)
-
-            url = f"{self.base_url}/videos"
+        def fetch(batch_ids):
             params = {
-                'key': self.api_key,
-                'id': ids_string,
-                'part': 'snippet,statistics,contentDetails'
+                'id': ','.join(batch_ids),
+                'part': 'snippet,statistics,contentDetails',
+                'fields': 'items(id,snippet(title,publishedAt),'
+                          'statistics(viewCount,likeCount,commentCount),contentDetails/duration)'
             }
+            return self._get_json(url, params).get('items', [])
 
-            response = requests.get(url, params=params)
-            data = response.json()
-
-            if 'items' in data:
-                video_details.extend(data['items'])
+        batches = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+        if len(batches) <= 1:
+            return [video for batch in batches for video in fetch(batch)]
 
-            time.sleep(0.1) # Rate limiting
+        # The shared token bucket in _get_json keeps the request rate in check
+        video_details = []
+        with ThreadPoolExecutor(max_workers = min(max_workers, len(batches))) as executor:
+            for items in executor.map(fetch, batches):
+                video_details.extend(items)
 
         return video_details
-    
+
     def get_video_comments(self, video_id, max_results = 100, order = 'time', include_replies = False):
         """
         Collect and store comments for a specific video
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._conn()
 
         comments_collected = 0
         next_page_token = None
@@ -554,93 +982,41 @@ class YouTubeMetricsTracker:
 
                 url = f"{self.base_url}/commentThreads"
                 params = {
-                    'key': self.api_key,
                     'videoId': video_id,
                     'part': 'snippet,replies',
                     'maxResults': batch_size,
                     'order': order,
-                    'textFormat': 'plainText'
+                    'textFormat': 'plainText',
+                    # Only the columns stored in the comments table
+                    'fields': 'nextPageToken,'
+                              f'items(snippet(totalReplyCount,topLevelComment(id,snippet({self.COMMENT_FIELDS}))),'
+                              f'replies/comments(id,snippet({self.COMMENT_FIELDS})))'
                 }
 
                 if next_page_token:
                     params['pageToken'] = next_page_token
 
-                response = requests.get(url, params = params, timeout = 30)
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_json(url, params)
 
                 if 'items' not in data or not data['items']:
                     self.logger.info("No more comments found")
                     break
 
-                for item in data['items']:
-                    try:
-                        top_comment = item['snippet']['topLevelComment']['snippet']
-                        comment_id = item['snippet']['topLevelComment']['id']
-
-                        cursor.execute('''
-                                       INSERT OR REPLACE INTO comments
-                                       (comment_id, video_id, author_name, author_channel_id, comment_text,
-                                        like_count, published_at, updated_at, reply_count, is_reply, parent_comment_id)
-                                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                       ''', (
-                                           comment_id,
-                                           video_id,
-                                           top_comment['authorDisplayName'],
-                                           top_comment.get('authorChannelId', {}).get('value', ''),
-                                           top_comment['textDisplay'],
-                                           top_comment['likeCount'],
-                                           top_comment['publishedAt'],
-                                           top_comment['updatedAt'],
-                                           item['snippet']['totalReplyCount'],
-                                           False,
-                                           None
-                                       ))
-                        comments_collected += 1
-
-                        # Handle replies if requested and available
-                        if include_replies and item['snippet']['totalReplyCount'] > 0:
-                            if 'replies' in item and 'comments' in item['replies']:
-                                for reply in item['replies']['comments']:
-                                    if comments_collected >= max_results:
-                                        break
-
-                                reply_snippet = reply['snippet']
-
-                                cursor.execute('''
-                                               INSERT OR REPLACE INTO comments
-                                               (comment_id, video_id, author_name, author_channel_id, comment_text,
-                                                like_count, published_at, updated_at, reply_count, is_reply, parent_comment_id)
-                                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                               ''', (
-                                                   reply['id'],
-                                                   video_id,
-                                                   reply_snippet['authorDisplayName'],
-                                                   reply_snippet.get('authorChannelId', {}).get('value', ''),
-                                                   reply_snippet['textDisplay'],
-                                                   reply_snippet['likeCount'],
-                                                   reply_snippet['publishedAt'],
-                                                   reply_snippet['updatedAt'],
-                                                   0,
-                                                   True,
-                                                   comment_id
-                                               ))
-                                comments_collected += 1
-
-                                if comments_collected >= max_results:
-                                    break
-                    except Exception as e:
-                        self.logger.warning(f"Error processing comment: {e}")
-                        continue
-                conn.commit()
+                # Store each page of comments in one transaction
+                rows = self._iter_comment_rows(data['items'], video_id, include_replies,
+                                               max_results - comments_collected)
+                with conn:
+                    cursor = conn.cursor()
+                    cursor.execute('BEGIN IMMEDIATE')
+                    cursor.executemany(self.INSERT_COMMENT_SQL, rows)
+                    comments_collected += cursor.rowcount
 
                 next_page_token = data.get('nextPageToken')
                 if not next_page_token:
                     self.logger.info("Reached end of available comments")
                     break
 
-                self.logger.info(f"Collected {comments_collected} comments so far...")
-                time.sleep(0.1)
+                self.logger.debug(f"Collected {comments_collected} comments so far...")
 
         except requests.exceptions.RequestException as e:
                 self.logger.error(f"API error collecting comments: {e}")
@@ -648,18 +1024,77 @@ class YouTubeMetricsTracker:
         except Exception as e:
                 self.logger.error(f"Unexpected error collecting comments: {e}")
                 return False
-        finally:
-                conn.close()
 
         self.logger.info(f"Successfully collected {comments_collected} comments for video {video_id}")
         return comments_collected
     
-    def collect_comments_for_tracked_videos(self, days_back = 7, max_comments_per_video = 50):
+    def _iter_comment_rows(self, items, video_id, include_replies, limit):
+        """
+        Yield comments table rows for a page of commentThreads items, at most limit rows
+        """
+        count = 0
+        for item in items:
+            if count >= limit:
+                return
+            try:
+                top_comment = item['snippet']['topLevelComment']['snippet']
+                comment_id = item['snippet']['topLevelComment']['id']
+                row = (
+                    comment_id,
+                    video_id,
+                    top_comment['authorDisplayName'],
+                    top_comment.get('authorChannelId', {}).get('value', ''),
+                    top_comment['textDisplay'],
+                    top_comment['likeCount'],
+                    top_comment['publishedAt'],
+                    top_comment['updatedAt'],
+                    item['snippet']['totalReplyCount'],
+                    False,
+                    None
+                )
+            except (KeyError, TypeError) as e:
+                self.logger.warning(f"Error processing comment: {e}")
+                continue
+
+            yield row
+            count += 1
+
+            # Handle replies if requested and available
+            if not include_replies or not item['snippet']['totalReplyCount']:
+                continue
+            for reply in item.get('replies', {}).get('comments', []):
+                if count >= limit:
+                    return
+                try:
+                    reply_snippet = reply['snippet']
+                    row = (
+                        reply['id'],
+                        video_id,
+                        reply_snippet['authorDisplayName'],
+                        reply_snippet.get('authorChannelId', {}).get('value', ''),
+                        reply_snippet['textDisplay'],
+                        reply_snippet['likeCount'],
+                        reply_snippet['publishedAt'],
+                        reply_snippet['updatedAt'],
+                        0,
+                        True,
+                        comment_id
+                    )
+                except (KeyError, TypeError) as e:
+                    self.logger.warning(f"Error processing comment: {e}")
+                    continue
+
+                yield row
+                count += 1
+
+    def collect_comments_for_tracked_videos(self, days_back = 7, max_comments_per_video = 50, max_workers = 4):
         """
         Collect comments for recent videos from all tracked channels
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
+
+        # published_at is the API's ISO string, so compare against a cutoff in the same format
+        cutoff_iso = (datetime.now(timezone.utc) - timedelta(days = days_back)).strftime('%Y-%m-%dT%H:%M:%SZ')
 
         # Get recent videos from tracked channels
         cursor.execute('''
@@ -667,99 +1102,184 @@ class YouTubeMetricsTracker:
                          FROM video_metrics vm
                          JOIN tracking_config tc ON vm.channel_id = tc.channel_id
                         WHERE tc.active = 1
-                             AND vm.published_at >= datetime('now', '-' || ? || ' days')
+                             AND vm.published_at >= ?
                         ORDER BY vm.timestamp DESC
-                       ''', (days_back,))
+                       ''', (cutoff_iso,))
         
         videos = cursor.fetchall()
-        conn.close()
 
         self.logger.info(f"Collecting comments for {len(videos)} recent videos")
 
-        for video_id, title in videos:
+        def collect(video):
+            video_id, title, _ = video
             self.logger.info(f"Collecting comments for: {title}")
-            self.get_video_comments(video_id, max_comments_per_video)
-            time.sleep(1)
+            return self.get_video_comments(video_id, max_comments_per_video)
+
+        # Page requests share the tracker's token bucket, so videos can be
+        # fetched concurrently without exceeding the API rate
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            list(executor.map(collect, videos))
 
         return len(videos)
     
-    def collect_all_tracked_channels(self):
+    def collect_all_tracked_channels(self, max_workers = 8, channels_per_second = 1):
         """
         Collect metrics for all active tracked channels
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
 
         cursor.execute(
             '''
-            SELECT channel_id, channel_name
+            SELECT channel_id, channel_name, track_videos, video_tracking_strategy,
+                   video_tracking_days, max_videos_to_track, uploads_playlist_id
               FROM tracking_config
               WHERE active = 1
             ''')
         
         channels = cursor.fetchall()
-        conn.close()
+
+        # Start each cycle with fresh channel statistics; expired entries are
+        # kept as a fallback for allow_stale lookups
+        with self._channel_cache_lock:
+            for channel_id, (_, channel_info) in self._channel_cache.items():
+                self._channel_cache[channel_id] = (0, channel_info)
 
         self.logger.info(f"Starting collection for {len(channels)} tracked channels")
 
-        for channel_id, channel_name in channels:
-            self.logger.info(f"Collecting metrics for {channel_name}")
-            self.collect_channel_metrics(channel_id)
-            time.sleep(1)
+        # Channels are independent, so overlap their API calls while the
+        # token bucket keeps the request rate within YouTube quotas
+        bucket = TokenBucket(rate = channels_per_second, capacity = max_workers)
+
+        # Tracking config is read here once, so worker threads never open
+        # their own database connections; rows go through the writer thread
+        def collect(channel):
+            channel_id, channel_name, *config = channel
+            bucket.acquire()
+            self.logger.debug(f"Collecting metrics for {channel_name}")
+            try:
+                channel_info = self.get_channel_info_cached(channel_id)
+                if not channel_info:
+                    self.logger.error(f"Could not fetch data for channel: {channel_id}")
+                    return [], None
+                self._queue_channel_row(channel_id, channel_info)
+                return self._fetch_upload_ids(channel_id, channel_info, config)
+            except Exception as e:
+                self.logger.error(f"Error collecting channel metrics: {e}")
+                return [], None
+
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            uploads = list(executor.map(collect, channels))
+
+        # videos.list takes up to 50 IDs from any channel, so one request per
+        # 50 videos across all channels instead of at least one per channel
+        all_ids = [video_id for video_ids, _ in uploads for video_id in video_ids]
+        try:
+            details = {video['id']: video for video in self.get_video_details(all_ids)}
+        except Exception as e:
+            self.logger.error(f"Error collecting video metrics: {e}")
+            details = {}
+
+        for channel, (video_ids, settings) in zip(channels, uploads):
+            video_details = [details[video_id] for video_id in video_ids if video_id in details]
+            if not video_details:
+                continue
+            try:
+                videos = self._select_videos_to_store(video_details, *settings)
+                self._queue_video_rows(channel[0], videos)
+            except Exception as e:
+                self.logger.error(f"Error collecting video metrics: {e}")
 
+        self.flush()
         self.logger.info("Collection completed for all tracked channels")
 
+    @retry_on_network_errors
     def collect_metrics_with_retry(self):
         """
-        Collect metrics with retry logic
+        Collect metrics, retrying the whole cycle on network errors
         """
-        for attempt in range(self.max_retries):
-            try:
-                return self.collect_all_tracked_channels()
-            except (ConnectionError, TimeoutError, requests.exceptions.RequestException) as e:
-                self.logger.info(f"Connection failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt < self.max_retries - 1:
-                    self.logger.info(f"Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
-                else:
-                    self.logger.error("Max retries reached. Skipping this collection cycle.")
-                    return None
+        return self.collect_all_tracked_channels()
 
-    def start_automated_collection(self, interval_hours = 1, run_immediately = True):
+    def start_automated_collection(self, interval_hours = 1, run_immediately = True,
+                                   collect_comments = False, comment_interval_hours = 6):
         """
         Start automated metric collection
+        Optionally also collects comments for recent videos on their own interval
+        Snapshots are stored per hour, so with interval_hours < 1 each run
+        overwrites the current hour's snapshot instead of adding a row
         """
-        def job():
-            self.logger.info("Running scheduled collection...")
-            self.collect_metrics_with_retry()
-
-        # Schedule the job
-        schedule.every(interval_hours).hours.do(job)
-
         self.logger.info(f"Automated collection scheduled every {interval_hours} hours")
-        
-        # Optionally run immediately
-        if run_immediately:
-            self.logger.info("Running initial collections...")
-            self.collect_metrics_with_retry()
+        if interval_hours < 1:
+            self.logger.warning("Metrics are stored hourly; runs within the same hour update one snapshot")
+        if collect_comments:
+            self.logger.info(f"Comment collection scheduled every {comment_interval_hours} hours")
 
         self.logger.info("Starting automated scheduler...")
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
+            asyncio.run(self._scheduler_loop(interval_hours, run_immediately,
+                                             comment_interval_hours if collect_comments else None))
         except KeyboardInterrupt:
             self.logger.info("Automated collection stopped by user")
         except Exception as e:
             self.logger.error(f"Scheduler error: {e}")
 
-    def start_automated_collection_background(self, interval_hours = 1, run_immediately = True):
+    async def _scheduler_loop(self, interval_hours, run_immediately, comment_interval_hours = None):
+        """
+        Run each scheduled job on its own timer until cancelled
+        """
+        loop = asyncio.get_running_loop()
+        self._scheduler = (loop, asyncio.current_task())
+
+        jobs = [self._run_every(interval_hours, run_immediately, "collection",
+                                self.collect_metrics_with_retry)]
+        if comment_interval_hours:
+            jobs.append(self._run_every(comment_interval_hours, run_immediately, "comment collection",
+                                        self.collect_comments_for_tracked_videos))
+
+        try:
+            await asyncio.gather(*jobs)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._scheduler = None
+
+    async def _run_every(self, interval_hours, run_immediately, name, job):
+        """
+        Sleep until the next run is due instead of polling
+        Jobs run in the default executor so the loop stays responsive
+        """
+        loop = asyncio.get_running_loop()
+
+        next_run = datetime.now()
+        if not run_immediately:
+            next_run += timedelta(hours = interval_hours)
+
+        while True:
+            await asyncio.sleep(max(0, (next_run - datetime.now()).total_seconds()))
+
+            self.logger.info(f"Running scheduled {name}...")
+            # A failed run is logged and the job waits for its next slot, so one
+            # job failing never stops the others
+            try:
+                await loop.run_in_executor(None, job)
+            except Exception as e:
+                self.logger.error(f"Scheduled {name} failed: {e}")
+
+            # Schedule from the planned time so runs don't drift, and
+            # skip any slots missed while a long run was going
+            next_run += timedelta(hours = interval_hours)
+            while next_run <= datetime.now():
+                self.logger.warning(f"Scheduled {name} overran its interval, skipping a run")
+                next_run += timedelta(hours = interval_hours)
+
+    def start_automated_collection_background(self, interval_hours = 1, run_immediately = True,
+                                              collect_comments = False, comment_interval_hours = 6):
         """
         Start automated collection in a background thread
         Returns the thread object so you can control it
         """
         def scheduler_worker():
-            self.start_automated_collection(interval_hours, run_immediately)
+            self.start_automated_collection(interval_hours, run_immediately,
+                                            collect_comments, comment_interval_hours)
 
         scheduler_thread = threading.Thread(target = scheduler_worker, daemon = True)
         scheduler_thread.start()
@@ -770,14 +1290,38 @@ class YouTubeMetricsTracker:
         """
         Stop all scheduled jobs
         """
-        schedule.clear()
+        if self._scheduler:
+            loop, task = self._scheduler
+            loop.call_soon_threadsafe(task.cancel)
         self.logger.info("Stopped automated collection")
 
+    def close(self):
+        """
+        Commit queued rows and release the HTTP session and this thread's connection
+        """
+        self.flush()
+        self.session.close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def export_data(self, channel_id, output_format = '.csv', days = None):
         """
         Export tracking data
         """
-        conn = sqlite3.connect(self.db_path)
+        output_format = output_format.lower()
+        if output_format not in ('.csv', '.json'):
+            self.logger.error(f"Unsupported format: {output_format}")
+            return None
+
+        conn = self._conn()
 
         # Base query
         base_query = '''
@@ -787,34 +1331,50 @@ class YouTubeMetricsTracker:
         
         params = [channel_id]
         if days:
-            base_query += " AND timestamp >= datetime('now', '-' || ? || ' days')"
+            # Compare against a literal so the (channel_id, timestamp) index is a range seek
+            # timestamps default to CURRENT_TIMESTAMP, which is UTC
+            cutoff = (datetime.now(timezone.utc) - timedelta(days = days)).strftime('%Y-%m-%d %H:%M:%S')
+            base_query += " AND timestamp >= ?"
 
-            params = [channel_id, days]
+            params = [channel_id, cutoff]
         
         base_query += " ORDER BY timestamp"
 
-        df = pd.read_sql_query(base_query, conn, params = params, parse_dates=['timestamp'])
-        conn.close()
+        def make_filename(channel_name):
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            return f"{channel_name.replace(' ', '_')}_metrics_{timestamp}{output_format}"
 
-        if df.empty:
+        # Rows stream straight from the cursor, so memory stays flat for long-tracked channels
+        cursor = conn.execute(base_query, params)
+        first_row = cursor.fetchone()
+        if first_row is None:
             self.logger.warning(f"No data to export for channel {channel_id}")
             return None
-        
-        # Generate filename
-        channel_name = df.iloc[0]['channel_name'].replace(' ', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        if output_format.lower() == '.csv':
-            filename = f"{channel_name}_metrics_{timestamp}.csv"
-            df.to_csv(filename, index=False)
+        columns = [d[0] for d in cursor.description]
+        filename = make_filename(first_row[columns.index('channel_name')])
+
+        if output_format == '.csv':
+            with open(filename, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerow(first_row)
+                writer.writerows(cursor)
 
-        elif output_format.lower() == '.json':
-            filename = f"{channel_name}_metrics_{timestamp}.json"
-            df.to_json(filename, orient='records', date_format='iso')
-        
         else:
-            self.logger.error(f"Unsupported format: {output_format}")
-            return None
-        
+            # Newline-delimited JSON, one record per line, with ISO 8601 timestamps
+            ts_index = columns.index('timestamp')
+            rows = [first_row]
+            with open(filename, 'wb') as f:
+                while rows:
+                    lines = []
+                    for row in rows:
+                        record = dict(zip(columns, row))
+                        if row[ts_index]:
+                            record['timestamp'] = row[ts_index].replace(' ', 'T', 1)
+                        lines.append(orjson.dumps(record))
+                    f.write(b'\n'.join(lines) + b'\n')
+                    rows = cursor.fetchmany(10_000)
+
         self.logger.info(f"Data exported to: {filename}")
         return filename
@@ -1,35 +1,88 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime
-import pandas as pd
+import csv
 import time
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
 import os
 
 class YouTubeChannelExtractor:
+    CHANNEL_URL_PATTERN = re.compile(r'/(?:channel/(?P<id>[^/?#]+)|c/(?P<name>[^/?#]+)|@(?P<handle>[^/?#]+))')
+    RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+    VIDEO_PARTS = 'snippet,statistics,contentDetails'
+    VIDEO_FIELDS = ('items(id,snippet(title,description,publishedAt,tags,categoryId,thumbnails/high/url),'
+                    'statistics(viewCount,likeCount,commentCount),contentDetails/duration)')
+
     def __init__(self, api_key):
         """
         Initialize with your YouTube Data API v3 key
         """
         self.api_key = api_key
         self.base_url = "https://www.googleapis.com/youtube/v3"
+        self._channel_id_cache = {}
+        self.setup_session()
+
+    def setup_session(self):
+        """
+        Setup a pooled HTTP session so API calls reuse the same TLS connection
+        """
+        self.session = requests.Session()
+        self.session.params = {'key': self.api_key}
+
+        adapter = HTTPAdapter(
+            pool_connections = 4,
+            pool_maxsize = 16,
+            max_retries = Retry(total = 3, backoff_factor = 0.3,
+                                status_forcelist = [429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+
+    def _get_json(self, url, params, max_retries = 5):
+        """
+        GET an API endpoint and decode the response
+        Rate limit errors back off and retry, other errors raise
+        """
+        for attempt in range(max_retries):
+            response = self.session.get(url, params = params, timeout = 30)
+
+            if response.status_code == 403 and attempt < max_retries - 1:
+                try:
+                    errors = orjson.loads(response.content).get('error', {}).get('errors', [])
+                except orjson.JSONDecodeError:
+                    errors = []
+                if any(error.get('reason') in self.RATE_LIMIT_REASONS for error in errors):
+                    delay = min(60, 2 ** attempt + random.uniform(0, 1))
+                    print(f"Rate limited by the API, retrying in {delay:.1f} seconds")
+                    time.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            return orjson.loads(response.content)
 
     def get_channel_id_from_username(self, username):
         """
         Get channel ID from username
         Example: 'https://www.youtube.com/user/MarquesBrownlee'
         """
+        cache_key = ('username', username)
+        if cache_key in self._channel_id_cache:
+            return self._channel_id_cache[cache_key]
+
         url = f"{self.base_url}/channels"
         params = {
-            'key': self.api_key,
             'forUsername': username,
             'part': 'id,snippet'
         }
 
-        response = requests.get(url, params = params)
-        data = response.json()
+        data = self._get_json(url, params)
 
         if 'items' in data and data['items']:
-            return data['items'][0]['id']
+            channel_id = self._channel_id_cache[cache_key] = data['items'][0]['id']
+            return channel_id
         else:
             print(f"Channel not found for username: {username}")
             return None
@@ -40,56 +93,62 @@ class YouTubeChannelExtractor:
         Examples: 'https://www.youtube.com/channel/UCBJycsmduvYEL83R_U4JriQ',
         'https://www.youtube.com/c/mkbhd', 'https://www.youtube.com/@mkbhd'
         """
-        if '/channel/' in channel_url:
-            return channel_url.split('/channel/')[-1].split('/')[0]
-        elif '/c/' in channel_url:
-            channel_name = channel_url.split('/c/')[-1].split('/')[0]
-            return self.search_channel_by_name(channel_name)
-        elif '/@' in channel_url:
-            handle = channel_url.split('/@')[-1].split('/')[0]
-            return self.search_channel_by_handle(handle)
-        else:
+        match = self.CHANNEL_URL_PATTERN.search(channel_url)
+        if not match:
             print("Unsupported URL format")
             return None
+
+        if match['id']:
+            return match['id']
+        elif match['name']:
+            return self.search_channel_by_name(match['name'])
+        else:
+            return self.search_channel_by_handle(match['handle'])
         
     def search_channel_by_name(self, channel_name):
         """
         Search for channel by name
         """
+        cache_key = ('name', channel_name)
+        if cache_key in self._channel_id_cache:
+            return self._channel_id_cache[cache_key]
+
         url = f"{self.base_url}/search"
         params = {
-            'key': self.api_key,
             'q':channel_name,
             'type': 'channel',
             'part': 'id',
             'maxResults': 1
         }
 
-        response = requests.get(url, params = params)
-        data = response.json()
+        data = self._get_json(url, params)
 
         if 'items' in data and data['items']:
-            return data['items'][0]['id']['channelId']
+            channel_id = self._channel_id_cache[cache_key] = data['items'][0]['id']['channelId']
+            return channel_id
         return None
     
     def search_channel_by_handle(self, handle):
         """
         Search for channel by handle (new format)
         """
+        cache_key = ('handle', handle)
+        if cache_key in self._channel_id_cache:
+            return self._channel_id_cache[cache_key]
+
         url = f"{self.base_url}/search"
         params = {
-            'key': self.api_key,
             'q': handle,
             'type': 'channel',
             'part': 'id',
             'maxResults': 5 # default value
         }
 
-        response = requests.get(url, params = params)
-        data = response.json()
+        data = self._get_json(url, params)
 
         if 'items' in data and data['items']:
-            return data['items'][0]['id']['channelId']
+            channel_id = self._channel_id_cache[cache_key] = data['items'][0]['id']['channelId']
+            return channel_id
         return None
     
     def get_channel_uploads_playlist(self, channel_id):
@@ -98,14 +157,12 @@ class YouTubeChannelExtractor:
         """
         url = f"{self.base_url}/channels"
         params = {
-            'key': self.api_key,
             'id': channel_id,
             'part': 'contentDetails,snippet,statistics'
 
         }
 
-        response = requests.get(url, params = params)
-        data = response.json()
+        data = self._get_json(url, params)
 
         if 'items' in data and data['items']:
             channel_info = data['items'][0]
@@ -126,18 +183,18 @@ class YouTubeChannelExtractor:
 
         while len(videos) < max_results:
             url = f"{self.base_url}/playlistItems"
+            # Only the video IDs are used, the details come from get_video_details
             params = {
-                'key': self.api_key,
                 'playlistId': playlist_id,
-                'part': 'snippet,contentDetails',
+                'part': 'contentDetails',
+                'fields': 'nextPageToken,items/contentDetails/videoId',
                 'maxResults': min(50, max_results - len(videos))
             }
 
             if next_page_token:
                 params['pageToken'] = next_page_token
 
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = self._get_json(url, params)
 
             if 'items' not in data:
                 break
@@ -152,32 +209,31 @@ class YouTubeChannelExtractor:
 
         return videos[:max_results]
     
-    def get_video_details(self, video_ids):
+    def get_video_details(self, video_ids, max_workers = 8):
         """
         Get detailed information for specific videos
-        Batch process for efficiency
+        Batches of 50 IDs are fetched concurrently, results keep the input order
         """
-        video_details = []
+        url = f"{self.base_url}/videos"
 
-        for i in range(0, len(video_ids), 50):
-            batch_ids = video_ids[i:i+50]
-            ids_string = ','.join(batch_ids)
-
-            url = f"{self.base_url}/videos"
+        def fetch(batch_ids):
             params = {
-                'key': self.api_key,
-                'id': ids_string,
-                'part': 'snippet, statistics, contentDetails, status'
+                'id': ','.join(batch_ids),
+                'part': self.VIDEO_PARTS,
+                'fields': self.VIDEO_FIELDS
             }
+            return self._get_json(url, params).get('items', [])
 
-            response = requests.get(url, params = params)
-            data = response.json()
-
-            if 'items' in data:
-                video_details.extend(data['items'])
+        batches = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+        if len(batches) <= 1:
+            return [video for batch in batches for video in fetch(batch)]
 
-            # Rate limiting
-            time.sleep(0.1)
+        # The API reports throttling as 403 rateLimitExceeded, which _get_json
+        # retries with backoff; anything else raises instead of dropping a batch
+        video_details = []
+        with ThreadPoolExecutor(max_workers = min(max_workers, len(batches))) as executor:
+            for items in executor.map(fetch, batches):
+                video_details.extend(items)
 
         return video_details
     
@@ -193,7 +249,6 @@ class YouTubeChannelExtractor:
 
             url = f"{self.base_url}/commentThreads"
             params = {
-                'key': self.api_key,
                 'videoId': video_id,
                 'part': 'snippet,replies',
                 'maxResults': batch_size,
@@ -205,9 +260,7 @@ class YouTubeChannelExtractor:
                 params['pageToken'] = next_page_token
 
             try:
-                response = requests.get(url, params = params)
-                response.raise_for_status() # raise HTTPError
-                data = response.json()
+                data = self._get_json(url, params) # raises HTTPError
 
                 if 'items' not in data:
                     print("No more comments found")
@@ -317,11 +370,15 @@ class YouTubeChannelExtractor:
             snippet = video.get('snippet', {})
             statistics = video.get('statistics', {})
             content_details = video.get('contentDetails', {})
+            video_id = video['id']
+            description = snippet.get('description', '')
+            thumbnail = snippet.get('thumbnails')
+            thumbnail_url = thumbnail['high'].get('url', '') if thumbnail and 'high' in thumbnail else ''
 
             processed_video = {
-                'video_id': video['id'],
+                'video_id': video_id,
                 'title': snippet.get('title', ''),
-                'description': snippet.get('description', '')[:description_limit] if truncate_description else snippet.get('description', ''),
+                'description': description[:description_limit] if truncate_description else description,
                 'published_at': snippet.get('publishedAt', ''),
                 'duration': content_details.get('duration', ''),
                 'view_count': int(statistics.get('viewCount', 0)),
@@ -329,8 +386,8 @@ class YouTubeChannelExtractor:
                 'comment_count': int(statistics.get('commentCount', 0)),
                 'tags': snippet.get('tags', []),
                 'category_id': snippet.get('categoryId', ''),
-                'thumbnail': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
-                'url': f"https://www.youtube.com/watch?v={video['id']}"
+                'thumbnail': thumbnail_url,
+                'url': f"https://www.youtube.com/watch?v={video_id}"
             }
 
             processed_videos.append(processed_video)
@@ -379,9 +436,10 @@ class YouTubeChannelExtractor:
 
         return result
     
-    def save_to_files(self, data, base_filename, output_dir = 'Data'):
+    def save_to_files(self, data, base_filename, output_dir = 'Data', pretty_json = True):
         """
         Save extracted data to JSON and CSV files
+        pretty_json = False writes compact JSON for machine consumption
         """
         if not data:
             print("No data to save")
@@ -391,22 +449,23 @@ class YouTubeChannelExtractor:
         
         # Save complete data as JSON
         json_filename = os.path.join(output_dir, f"{base_filename}_complete.json")
-        with open(json_filename, 'w', encoding = 'utf-8') as f:
-            json.dump(data, f, indent = 2, ensure_ascii = False)
+        with open(json_filename, 'wb') as f:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty_json:
+                option |= orjson.OPT_INDENT_2
+            f.write(orjson.dumps(data, option = option))
         print(f"Complete data saved to: {json_filename}")
         
         # Save videos CSV
         if 'videos' in data and data['videos']:
             csv_filename = os.path.join(output_dir, f"{base_filename}_videos.csv")
-            df = pd.DataFrame(data['videos'])
-            df.to_csv(csv_filename, index = False, encoding = 'utf-8')
+            self._write_csv(csv_filename, data['videos'])
             print(f"Videos data saved to: {csv_filename}")
          
         # Save comments CSV separately
         if 'comments' in data and data['comments']:
             comments_filename = os.path.join(output_dir, f"{base_filename}_comments.csv")
-            comments_df = pd.DataFrame(data['comments'])
-            comments_df.to_csv(comments_filename, index = False, encoding = 'utf-8')
+            self._write_csv(comments_filename, data['comments'])
             print(f"Comments data saved to: {comments_filename}")
 
         summary_filename = os.path.join(output_dir, f"{base_filename}_summary.txt")
@@ -423,6 +482,11 @@ class YouTubeChannelExtractor:
             f.write(f"Description: {summary['channel_description']}\n")
         print(f"Summary saved to: {summary_filename}")
 
-
-
-
+    def _write_csv(self, filename, rows):
+        """
+        Write a list of same-shaped dicts to CSV, header taken from the first row
+        """
+        with open(filename, 'w', newline = '', encoding = 'utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames = list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
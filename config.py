@@ -1,3 +1,5 @@
+import re
+
 # Product categories and classification rules
 product_keywords = {
     'stationery': ['stationery'],
@@ -84,17 +86,17 @@ brands = {'paper': [
 
 
 # Keywords for analyzing comment sentiment
-positive_words = ['love', 'amazing', 'great', 'perfect', 'best', 'beautiful',
+positive_words = frozenset(['love', 'amazing', 'great', 'perfect', 'best', 'beautiful',
                   'satisfying', 'pretty', 'cute', 'nice', 'adorable', 'fantastic',
-                  'excellent', 'wonderful', 'awesome', 'gorgeous', 'stunning']
+                  'excellent', 'wonderful', 'awesome', 'gorgeous', 'stunning'])
 
-negative_words = ['hate', 'terrible', 'bad', 'worst', 'disappointed', 'awful',
-                  'horrible', 'ugly', 'poor', 'waste', 'regret', 'useless']
+negative_words = frozenset(['hate', 'terrible', 'bad', 'worst', 'disappointed', 'awful',
+                  'horrible', 'ugly', 'poor', 'waste', 'regret', 'useless'])
 
-purchase_intent = ['where', 'buy', 'need', 'want', 'order', 'money', 'wallet',
+purchase_intent = frozenset(['where', 'buy', 'need', 'want', 'order', 'money', 'wallet',
                    'stock', 'available', 'price', 'request', 'restock', 'purchase', 'notification',
                    'sell', 'shop', 'store', 'link', 'amazon','shipping', 'delivery', 'checkout',
-                   'cart', 'afford', 'expensive', 'cheap', 'deal', 'sale', 'discount']
+                   'cart', 'afford', 'expensive', 'cheap', 'deal', 'sale', 'discount'])
 
 # Keywords to group questions
 topic_patterns = {
@@ -106,4 +108,25 @@ topic_patterns = {
     'compatibility': ['compatible', 'fit', 'work with', 'size'],
     'quality': ['quality', 'durable', 'last', 'worth']
 
-}
\ No newline at end of file
+}
+
+
+# Brands flattened once with their lowercase form; the display casing is kept
+# for reporting. Multi-word brands are matched as substrings, others as words
+brand_index = tuple((category, brand, brand.lower(), ' ' in brand or "'" in brand)
+                    for category, brand_list in brands.items()
+                    for brand in brand_list)
+
+# Precompiled matchers: one alternation per category, so a text is scanned once
+# per category instead of once per keyword. Matches are substring matches, the
+# same as `keyword in text`
+def _keyword_pattern(keywords):
+    keywords = sorted({k.lower() for k in keywords}, key = len, reverse = True)
+    return re.compile('|'.join(re.escape(k) for k in keywords))
+
+product_keyword_patterns = {category: _keyword_pattern(keywords)
+                            for category, keywords in product_keywords.items()}
+content_type_patterns = {category: _keyword_pattern(keywords)
+                         for category, keywords in content_types.items()}
+topic_keyword_patterns = {topic: _keyword_pattern(keywords)
+                          for topic, keywords in topic_patterns.items()}
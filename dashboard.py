@@ -1,15 +1,36 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-import json
+import orjson
 import plotly.express as px
 from datetime import datetime, timedelta
 
 db_path = 'youtube_metrics.db'
-conn = sqlite3.connect(db_path)
+
+@st.cache_resource
+def get_connection():
+    # One read-only connection shared across reruns, which run on different script threads.
+    # The tracker already put the database in WAL mode, so reads never block its writes
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri = True, check_same_thread = False)
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-64000')
+    return conn
+
+@st.cache_data(ttl = 600)
+def run_query(query, params = ()):
+    # Reruns with the same SQL and parameters are served from the cache
+    return pd.read_sql_query(query, get_connection(), params = params)
+
+def parse_json_list(value):
+    # Stored JSON arrays; missing or malformed values count as empty
+    try:
+        return orjson.loads(value) if value else []
+    except orjson.JSONDecodeError:
+        return []
 
 query = 'SELECT DISTINCT channel_id, channel_name FROM tracking_config WHERE active = 1'
-channel_mapping = pd.read_sql_query(query, conn).set_index('channel_name')['channel_id'].to_dict()
+channel_mapping = run_query(query).set_index('channel_name')['channel_id'].to_dict()
 
 available_channels = list(channel_mapping.keys())
 
@@ -38,9 +59,9 @@ if not selected_channel_names:
     st.warning('Please select at least one channel')
     st.stop()
 
-# Convert to SQL format
-selected_channel_ids = [channel_mapping[name] for name in selected_channel_names]
-channel_id_list = "'" + "','".join(selected_channel_ids) + "'"
+# Convert to SQL format: one placeholder per channel, values bound as parameters
+selected_channel_ids = tuple(channel_mapping[name] for name in selected_channel_names)
+placeholders = ','.join('?' * len(selected_channel_ids))
 
 # ============ ROW 1: Daily Engagement Trend ============
 st.subheader('Daily Engagement Trend')
@@ -54,11 +75,11 @@ query = f"""
         ON vem.video_id = pv.video_id
       JOIN tracking_config tc
         ON pv.channel_id = tc.channel_id
-     WHERE pv.channel_id IN ({channel_id_list})
+     WHERE pv.channel_id IN ({placeholders})
      GROUP BY DATE(vem.timestamp), tc.channel_name
      ORDER BY DATE(vem.timestamp)
 """
-df_trend = pd.read_sql_query(query, conn)
+df_trend = run_query(query, selected_channel_ids)
 
 if not df_trend.empty:
     fig = px.line(
@@ -96,6 +117,11 @@ query = f"""
       SELECT video_id, MAX(id) AS max_id
         FROM video_metrics
        GROUP BY video_id
+    ),
+    latest_vem AS (
+      SELECT video_id, MAX(id) AS max_id
+        FROM video_engagement_metrics
+       GROUP BY video_id
     )
     SELECT vm.title, tc.channel_name, vem.engagement_rate, vm.view_count
       FROM video_metrics vm
@@ -104,20 +130,17 @@ query = f"""
           AND vm.id = lm.max_id
       JOIN processed_videos pv
         ON vm.video_id = pv.video_id
+      JOIN latest_vem lv
+        ON pv.video_id = lv.video_id
       JOIN video_engagement_metrics vem
-        ON pv.video_id = vem.video_id
+        ON vem.id = lv.max_id
       JOIN tracking_config tc
         ON pv.channel_id = tc.channel_id
-     WHERE pv.channel_id IN ({channel_id_list})
-          AND vem.id IN (
-            SELECT MAX(id) FROM video_engagement_metrics
-             WHERE video_id IN (SELECT video_id FROM processed_videos WHERE channel_id IN ({channel_id_list}))
-             GROUP BY video_id
-            )
+     WHERE pv.channel_id IN ({placeholders})
      ORDER BY vem.engagement_rate DESC
      LIMIT 10
 """
-top_videos = pd.read_sql_query(query, conn)
+top_videos = run_query(query, selected_channel_ids)
 
 if not top_videos.empty:
     top_videos['engagement_rate'] = (top_videos['engagement_rate'] * 100).round(2)
@@ -144,36 +167,27 @@ else:
 
 st.subheader('Engagement by Brand')
 query = f"""
-    SELECT pv.video_id, pv.brands_mentioned, vem.engagement_rate
+    WITH latest_vem AS (
+      SELECT video_id, MAX(id) AS max_id
+        FROM video_engagement_metrics
+       GROUP BY video_id
+    )
+    SELECT json_extract(je.value, '$.brand') AS brand, vem.engagement_rate
       FROM processed_videos pv
-      LEFT JOIN video_engagement_metrics vem
-        ON pv.video_id = vem.video_id
-     WHERE pv.channel_id IN ({channel_id_list})
-          AND vem.id IN (
-          SELECT MAX(id) FROM video_engagement_metrics
-           WHERE video_id IN (SELECT video_id FROM processed_videos WHERE channel_id IN ({channel_id_list}))
-           GROUP BY video_id
-          )
+      JOIN latest_vem lv
+        ON pv.video_id = lv.video_id
+      JOIN video_engagement_metrics vem
+        ON vem.id = lv.max_id
+      JOIN json_each(pv.brands_mentioned) je
+     WHERE pv.channel_id IN ({placeholders})
+          AND json_valid(pv.brands_mentioned)
 """
 
-df_brands = pd.read_sql_query(query, conn)
-
-# Parse brands
-brands_list = []
-for idx, row in df_brands.iterrows():
-    if row['brands_mentioned']:
-        try:
-            brands = json.loads(row['brands_mentioned'])
-            for brand_obj in brands:
-                brands_list.append({
-                    'brand': brand_obj['brand'],
-                    'engagement_rate': row['engagement_rate']
-                })
-        except json.JSONDecodeError:
-            continue
-
-if brands_list:
-    brands_df = pd.DataFrame(brands_list)
+# One row per brand mention, exploded by SQLite; the median stays in pandas
+# since SQLite has no MEDIAN aggregate
+brands_df = run_query(query, selected_channel_ids)
+
+if not brands_df.empty:
     brand_engagement = brands_df.groupby('brand')['engagement_rate'].median().sort_values(ascending=False).head(10)
     brand_counts = brands_df.groupby('brand').size()
     brands_with_enough_data = brand_engagement[brand_counts >= 3].index
@@ -199,24 +213,16 @@ st.subheader('Product Categories Coverage')
 query = f"""
     SELECT video_id, product_categories
       FROM processed_videos
-     WHERE channel_id IN ({channel_id_list})
+     WHERE channel_id IN ({placeholders})
 """
 
-df_products = pd.read_sql_query(query, conn)
+df_products = run_query(query, selected_channel_ids)
 
-# Parse products
-product_category_list = {}
-for idx, row in df_products.iterrows():
-    if row['product_categories']:
-        try:
-            product_categories = json.loads(row['product_categories'])
-            for cat in product_categories:
-                product_category_list[cat] = product_category_list.get(cat, 0) + 1
-        except json.JSONDecodeError:
-            continue
+# Parse products and count videos per category
+product_categories = df_products['product_categories'].map(parse_json_list).explode().dropna()
 
-if product_category_list:
-    category_series = pd.Series(product_category_list).sort_values(ascending = True)
+if not product_categories.empty:
+    category_series = product_categories.value_counts().sort_values(ascending = True)
 
     # Control how colors are used repetitively explicitly
     # colors_gradient = [COLORS['success'], COLORS['info'], COLORS['accent']] * (len(category_series) // 3 + 1)
@@ -245,12 +251,12 @@ query = f"""
       FROM comments c
       JOIN processed_videos pv
         ON c.video_id = pv.video_id
-     WHERE pv.channel_id IN ({channel_id_list})
+     WHERE pv.channel_id IN ({placeholders})
           AND sentiment IS NOT NULL
      GROUP BY sentiment
 """
 
-df_sentiment = pd.read_sql_query(query, conn)
+df_sentiment = run_query(query, selected_channel_ids)
 
 fig = px.pie(df_sentiment, values = 'count', names = 'sentiment',
              color = 'sentiment',
@@ -264,27 +270,29 @@ st.plotly_chart(fig)
 
 st.subheader('Purchase Intent Signals')
 query = f"""
-    SELECT DISTINCT c.comment_id, tc.channel_name, vm.title, c.comment_text, c.author_name
+    WITH latest_metrics AS (
+      SELECT video_id, MAX(id) AS max_id
+        FROM video_metrics
+       GROUP BY video_id
+    )
+    SELECT DISTINCT c.comment_id, tc.channel_name, vm.title, c.comment_text, c.author_name,
+           substr(c.comment_text, 1, 100) || '...' AS comment_preview
       FROM comments c
-      JOIN (
-          SELECT video_id, title
-          FROM video_metrics
-          GROUP BY video_id
-      ) vm
-        ON c.video_id = vm.video_id
+      JOIN latest_metrics lm
+        ON c.video_id = lm.video_id
+      JOIN video_metrics vm
+        ON vm.id = lm.max_id
       JOIN processed_videos pv
         ON c.video_id = pv.video_id
       JOIN tracking_config tc
         ON pv.channel_id = tc.channel_id
-     WHERE pv.channel_id IN ({channel_id_list})
+     WHERE pv.channel_id IN ({placeholders})
           AND c.purchase_intent = 1
      ORDER BY c.published_at DESC
      LIMIT 20
 """
 
-purchase_comments = pd.read_sql_query(query, conn)
-
-purchase_comments['comment_preview'] = purchase_comments['comment_text'].str[:100] + '...'
+purchase_comments = run_query(query, selected_channel_ids)
 
 st.dataframe(
     purchase_comments[['channel_name', 'title', 'comment_preview', 'author_name']].rename(columns = {
@@ -309,9 +317,9 @@ st.dataframe(
 )
 
 st.subheader('Full Comments')
-for idx, row in purchase_comments.iterrows():
-    with st.expander(f"💬{row['author_name']} on {row['title']}..."):
-        st.write(row['comment_text'])
+for row in purchase_comments.itertuples(index = False):
+    with st.expander(f"💬{row.author_name or 'Unknown'} on {row.title}..."):
+        st.write(row.comment_text)
 
 
 # ============ ROW 7: Recent Questions Asked (Table) ============
@@ -320,27 +328,29 @@ st.subheader('Recent Customer Questions')
 st.caption('Latest questions from viewers - reveals customer interests and potential content ideas')
 
 query = f"""
-    SELECT DISTINCT c.comment_id, c.comment_text, vm.title, tc.channel_name, c.published_at
+    WITH latest_metrics AS (
+      SELECT video_id, MAX(id) AS max_id
+        FROM video_metrics
+       GROUP BY video_id
+    )
+    SELECT DISTINCT c.comment_id, c.comment_text, vm.title, tc.channel_name, c.published_at,
+           substr(c.comment_text, 1, 100) || '...' AS comment_preview
       FROM comments c
-      JOIN (
-          SELECT video_id, title
-          FROM video_metrics
-          GROUP BY video_id
-      ) vm
-        ON c.video_id = vm.video_id
+      JOIN latest_metrics lm
+        ON c.video_id = lm.video_id
+      JOIN video_metrics vm
+        ON vm.id = lm.max_id
       JOIN processed_videos pv
         ON c.video_id = pv.video_id
       JOIN tracking_config tc
         ON pv.channel_id = tc.channel_id
-     WHERE pv.channel_id IN ({channel_id_list})
+     WHERE pv.channel_id IN ({placeholders})
           AND c.is_question = 1
      ORDER BY c.published_at DESC
      LIMIT 20
 """
 
-questions = pd.read_sql_query(query, conn)
-
-questions['comment_preview'] = questions['comment_text'].str[:100] + '...'
+questions = run_query(query, selected_channel_ids)
 
 if not questions.empty:
     st.dataframe(
@@ -362,9 +372,9 @@ if not questions.empty:
     )
 
     st.subheader('Full Questions')
-    for idx, row in questions.iterrows():
-        with st.expander(f"🤔{row['title']} on {row['published_at']}..."):
-            st.write(row['comment_text'])
+    for row in questions.itertuples(index = False):
+        with st.expander(f"🤔{row.title} on {row.published_at}..."):
+            st.write(row.comment_text)
 else:
     st.info('No questions found')
 
@@ -373,30 +383,22 @@ else:
 st.subheader('Brand Sentiment from Comments')
 
 query = f"""
-    SELECT c.brands_mentioned, c.sentiment, c.comment_text
+    SELECT json_extract(je.value, '$.brand') AS brand, c.sentiment, COUNT(*) AS count
       FROM comments c
       JOIN processed_videos pv
         ON c.video_id = pv.video_id
-     WHERE pv.channel_id IN ({channel_id_list})
-          AND c.brands_mentioned IS NOT NULL
+      JOIN json_each(c.brands_mentioned) je
+     WHERE pv.channel_id IN ({placeholders})
           AND c.brands_mentioned != '[]'
+          AND json_valid(c.brands_mentioned)
+          AND c.sentiment IS NOT NULL
+     GROUP BY brand, c.sentiment
 """
 
-temp = pd.read_sql_query(query, conn)
-
-# Parse JSON and aggregate
-brand_sentiment = []
-for idx, row in temp.iterrows():
-    brands = json.loads(row['brands_mentioned'])
-    for brand_obj in brands:
-        brand_sentiment.append({
-            'brand': brand_obj['brand'],
-            'sentiment': row['sentiment']
-        })
-
-brand_sentiment_df = pd.DataFrame(brand_sentiment)
+# Mentions per brand and sentiment are counted by SQLite
+brand_sentiment = run_query(query, selected_channel_ids)
 
-brand_sentiment_pivot = brand_sentiment_df.groupby(['brand', 'sentiment']).size().unstack(fill_value=0)
+brand_sentiment_pivot = brand_sentiment.pivot(index = 'brand', columns = 'sentiment', values = 'count').fillna(0).astype(int)
 
 # Filter brands with at least 5 mentions
 brand_totals = brand_sentiment_pivot.sum(axis = 1)
@@ -425,8 +427,4 @@ fig.update_layout(
     barmode = 'stack'
 )
 
-st.plotly_chart(fig, width = 'stretch')       
-
-conn.close()
-
-
+st.plotly_chart(fig, width = 'stretch')
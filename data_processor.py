@@ -9,7 +9,8 @@ import json
 from sentence_transformers import SentenceTransformer
 import pandas as pd
 from sklearn.cluster import DBSCAN
-from config import product_keywords, content_types, brands, positive_words, negative_words, purchase_intent, topic_patterns
+from config import brand_index, positive_words, negative_words, purchase_intent
+from config import product_keyword_patterns, content_type_patterns, topic_keyword_patterns
 
 class YouTubeDataProcessor:
     """
@@ -553,8 +554,8 @@ class YouTubeDataProcessor:
 
                 # Find matching topics
                 matched_topics = []
-                for topic, keywords in topic_patterns.items():
-                    if any(keyword in text_lower for keyword in keywords):
+                for topic, pattern in topic_keyword_patterns.items():
+                    if pattern.search(text_lower):
                         matched_topics.append(topic)
 
                 # Store primary topic (or "general" if no match)
@@ -626,13 +627,13 @@ class YouTubeDataProcessor:
         found_content_types = []
         
         # Check product categories
-        for category, keywords in product_keywords.items():
-            if any(keyword in text_cleaned for keyword in keywords):
+        for category, pattern in product_keyword_patterns.items():
+            if pattern.search(text_cleaned):
                 products.append(category)
         
         # Check content types
-        for category, keywords in content_types.items():
-            if any(keyword in text_cleaned for keyword in keywords):
+        for category, pattern in content_type_patterns.items():
+            if pattern.search(text_cleaned):
                 found_content_types.append(category)
 
         return {'products': products, 'content_types': found_content_types}
@@ -654,29 +655,20 @@ class YouTubeDataProcessor:
         brands_found = []
         brands_seen = set()
 
-        for category, brand_list in brands.items():
-            for brand in brand_list:
-                brand_lower = brand.lower()
-
-                # Skip if already found
-                if brand in brands_seen:
-                    continue
-
-                # Multi-word brands (e.g., "TRAVELER'S COMPANY")
-                if ' ' in brand_lower or "'" in brand_lower:
-                    if brand_lower in text_lower:
-                        brands_found.append({
-                            'brand': brand,
-                            'category': category
-                        })
-                        brands_seen.add(brand)
-                # Single-word brands with exact matching
-                elif brand_lower in words_set:
-                    brands_found.append({
-                        'brand': brand,
-                        'category': category
-                    })
-                    brands_seen.add(brand)
+        for category, brand, brand_lower, multi_word in brand_index:
+            # Skip if already found
+            if brand in brands_seen:
+                continue
+
+            # Multi-word brands (e.g., "TRAVELER'S COMPANY") match as substrings,
+            # single-word brands need an exact word match
+            haystack = text_lower if multi_word else words_set
+            if brand_lower in haystack:
+                brands_found.append({
+                    'brand': brand,
+                    'category': category
+                })
+                brands_seen.add(brand)
 
         return brands_found
 
@@ -741,7 +733,7 @@ class YouTubeDataProcessor:
         else:
             sentiment = 'neutral'
 
-        has_purchase_intent = any(word in words_set for word in purchase_intent)
+        has_purchase_intent = not purchase_intent.isdisjoint(words_set)
         is_question = '?' in comment_text
 
         return {
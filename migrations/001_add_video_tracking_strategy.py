@@ -7,25 +7,30 @@ def up(conn):
     # Check if columns already exist (safety check)
     cursor.execute("PRAGMA table_info(tracking_config)")
     columns = [col[1] for col in cursor.fetchall()]
+    columns_added = False
 
     if 'video_tracking_strategy' not in columns:
         cursor.execute('''
             ALTER TABLE tracking_config
             ADD COLUMN video_tracking_strategy TEXT DEFAULT 'time_based'
         ''')
+        columns_added = True
     
     if 'video_tracking_days' not in columns:
         cursor.execute('''
             ALTER TABLE tracking_config
             ADD COLUMN video_tracking_days INTEGER DEFAULT 30
         ''')
+        columns_added = True
 
-    cursor.execute('''
-        UPDATE tracking_config
-        SET video_tracking_strategy = 'time_based',
-           video_tracking_days = 30
-        WHERE video_tracking_strategy IS NULL
-        ''')
+    # Backfill only when the columns are new, instead of scanning the table on every run
+    if columns_added:
+        cursor.execute('''
+            UPDATE tracking_config
+            SET video_tracking_strategy = 'time_based',
+               video_tracking_days = 30
+            WHERE video_tracking_strategy IS NULL
+            ''')
     
 def down(conn):
     """
@@ -0,0 +1,21 @@
+def up(conn):
+    """
+    Add uploads_playlist_id column to tracking_config table
+    """
+    cursor = conn.cursor()
+
+    # Check if the column already exists
+    cursor.execute('PRAGMA table_info(tracking_config)')
+    columns = [col[1] for col in cursor.fetchall()]
+
+    if 'uploads_playlist_id' not in columns:
+        cursor.execute('''
+            ALTER TABLE tracking_config
+            ADD COLUMN uploads_playlist_id TEXT
+        ''')
+
+def down(conn):
+    """
+    Pass for now
+    """
+    pass
@@ -0,0 +1,35 @@
+def up(conn):
+    """
+    Add indices for the dashboard's comment filters and per-video joins
+    """
+    cursor = conn.cursor()
+
+    # Sentiment counts per channel, covered without touching the table
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_comments_video_sentiment
+        ON comments(video_id, sentiment)
+    ''')
+
+    # Latest purchase-intent comments and latest questions
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_comments_purchase
+        ON comments(purchase_intent, published_at DESC)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_comments_question
+        ON comments(is_question, published_at DESC)
+    ''')
+
+    # Refresh planner statistics so the new indices get picked
+    cursor.execute('ANALYZE')
+
+def down(conn):
+    """
+    Remove dashboard indices
+    """
+    cursor = conn.cursor()
+
+    cursor.execute('DROP INDEX IF EXISTS idx_comments_video_sentiment')
+    cursor.execute('DROP INDEX IF EXISTS idx_comments_purchase')
+    cursor.execute('DROP INDEX IF EXISTS idx_comments_question')
@@ -91,7 +91,7 @@ def main(days = 7, hours = 0, minutes = 0):
                 print(f"Channel ID: {channel_id}")
                 print(f"Channel Name: {channel_info['snippet']['title']}") 
 
-    thread = tracker.start_automated_collection_background(metric_interval_hours = 1, run_immediately = True,
+    thread = tracker.start_automated_collection_background(interval_hours = 1, run_immediately = True,
                                                            collect_comments = True, comment_interval_hours = 6)
     print("Background collection started!")
     print("Press Ctrl+C to stop gracefully")